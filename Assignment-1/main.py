@@ -3,28 +3,21 @@
 #  Uses: DeepSeek API | LangChain | PromptTemplate | StrOutputParser
 # ============================================================
 
+import argparse
 import os
+import sys
+import threading
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+
+# LangChain, httpx and the OpenAI SDK are imported inside get_chain(), so
+# the script starts quickly and only pays for them when they are needed
 
 # ─── Load environment variables ────────────────────────────
 load_dotenv()
 DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
 
-# ─── 1. Initialize the DeepSeek Model via OpenAI-compatible API ─
-model = ChatOpenAI(
-    model="deepseek-chat",                        # DeepSeek's chat model
-    api_key=DEEPSEEK_API_KEY,
-    base_url="https://api.deepseek.com/v1",       # DeepSeek's endpoint
-    temperature=0.7,
-)
-
-# ─── 2. Create a PromptTemplate ─────────────────────────────
-prompt_template = PromptTemplate(
-    input_variables=["paragraph"],
-    template="""
+# ─── Prompt text ────────────────────────────────────────────
+PROMPT_TEXT = """
 You are an expert writing assistant. Analyze the paragraph below and respond in plain text only.
 Do NOT use JSON, markdown code blocks, or any special formatting characters.
 
@@ -42,23 +35,130 @@ Write only one word here — either Formal, Casual, or Technical.
 IMPROVED VERSION:
 Write a clearly improved version of the paragraph here, fixing grammar, flow, and clarity.
 """.strip()
-)
-
-# ─── 3. Create StrOutputParser ──────────────────────────────
-parser = StrOutputParser()
 
-# ─── 4. Chain: prompt | model | parser ──────────────────────
-chain = prompt_template | model | parser
+# Built on first use by get_chain() / get_openai_client()
+_chain = None
+_http_client = None
+_openai_client = None
+
+
+def get_chain():
+    """Build the prompt | model | parser chain once and reuse it."""
+    global _chain, _http_client
+    if _chain is not None:
+        return _chain
+
+    import httpx
+    from langchain_openai import ChatOpenAI
+    from langchain.prompts import PromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    # ─── 1. Initialize the DeepSeek Model via OpenAI-compatible API ─
+    # One pooled HTTP client, so repeated calls reuse the TLS connection
+    _http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60.0),
+        timeout=httpx.Timeout(60.0),
+    )
+
+    model = ChatOpenAI(
+        model="deepseek-chat",                        # DeepSeek's chat model
+        api_key=DEEPSEEK_API_KEY,
+        base_url="https://api.deepseek.com/v1",       # DeepSeek's endpoint
+        temperature=0.7,
+        http_client=_http_client,
+    )
+
+    # ─── 2. Create a PromptTemplate ─────────────────────────
+    prompt_template = PromptTemplate(
+        input_variables=["paragraph"],
+        template=PROMPT_TEXT,
+    )
+
+    # ─── 3. Create StrOutputParser ──────────────────────────
+    parser = StrOutputParser()
+
+    # ─── 4. Chain: prompt | model | parser ──────────────────
+    _chain = prompt_template | model | parser
+    return _chain
+
+
+def get_openai_client():
+    """
+    Raw OpenAI SDK client for DeepSeek, sharing the chain's HTTP pool.
+    Used where LangChain's .invoke() cannot express the request (n > 1).
+    """
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+
+        get_chain()  # creates the shared _http_client
+        _openai_client = OpenAI(
+            api_key=DEEPSEEK_API_KEY,
+            base_url="https://api.deepseek.com/v1",
+            http_client=_http_client,
+        )
+    return _openai_client
+
+
+def _warm_up_connection() -> None:
+    """Open a TLS connection to DeepSeek; the response itself is ignored."""
+    try:
+        _http_client.head("https://api.deepseek.com/v1/models")
+    except Exception:
+        pass  # best effort - the real request will connect anyway
+
+
+def preconnect() -> None:
+    """Start the HTTPS handshake with DeepSeek in the background."""
+    get_chain()
+    threading.Thread(target=_warm_up_connection, daemon=True).start()
 
 
 # ─── 5. Run the Application ─────────────────────────────────
 def transform_text(paragraph: str) -> str:
-    """Pass a paragraph through the chain and return plain string output."""
-    result = chain.invoke({"paragraph": paragraph})
-    return result
+    """
+    Pass a paragraph through the chain and return plain string output.
+    Tokens are printed as soon as they arrive, so output appears while
+    the model is still generating.
+    """
+    chunks = []
+    for chunk in get_chain().stream({"paragraph": paragraph}):
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+        chunks.append(chunk)
+    sys.stdout.write("\n")
+    return "".join(chunks)
+
+
+def transform_text_variants(paragraph: str, n: int = 3) -> list[str]:
+    """
+    Generate n alternative transformations of a paragraph.
+    All variants come from one HTTP request using the `n` parameter of
+    the chat completions API, instead of n separate chain calls.
+    If the provider ignores `n`, fewer variants are returned.
+    """
+    response = get_openai_client().chat.completions.create(
+        model="deepseek-chat",
+        messages=[{"role": "user", "content": PROMPT_TEXT.format(paragraph=paragraph)}],
+        temperature=0.7,
+        n=n,
+    )
+    return [choice.message.content for choice in response.choices]
 
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="AI Text Transformer")
+    arg_parser.add_argument(
+        "--variants",
+        type=int,
+        default=1,
+        help="number of alternative results to generate in one request",
+    )
+    args = arg_parser.parse_args()
+
+    # Connect to DeepSeek while the input is being printed
+    preconnect()
+
     print("=" * 60)
     print("        AI TEXT TRANSFORMER (Powered by DeepSeek)")
     print("=" * 60)
@@ -76,11 +176,19 @@ def main():
     print("\n" + "-" * 60)
     print("⏳ Analyzing with DeepSeek...\n")
 
-    # ── Invoke the chain ────────────────────────────────────
-    output = transform_text(sample_paragraph)
-
+    if args.variants > 1:
+        # ── Several variants from a single request ──────────
+        variants = transform_text_variants(sample_paragraph, n=args.variants)
+        for idx, variant in enumerate(variants, 1):
+            print(f"✅ TRANSFORMATION RESULT {idx} of {len(variants)}:\n")
+            print(variant)
+            print("\n" + "-" * 60)
+        print("=" * 60)
+        return
+
+    # ── Stream the chain output ─────────────────────────────
     print("✅ TRANSFORMATION RESULT:\n")
-    print(output)
+    transform_text(sample_paragraph)
     print("\n" + "=" * 60)
 
 
@@ -0,0 +1,24 @@
+"""
+config.py - Settings for the resume extractor
+Reads the .env file and environment variables once, at import time
+"""
+
+import os
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+# Load .env file
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class Settings:
+    """DeepSeek API configuration shared by the whole project."""
+    
+    api_key: str
+    base_url: str = "https://api.deepseek.com/v1"  # DeepSeek API endpoint
+    model: str = "deepseek-chat"                   # DeepSeek's main model
+    llm_cache_path: str = ".llm_cache.db"          # SQLite cache of LLM responses
+
+
+SETTINGS = Settings(api_key=os.getenv("DEEPSEEK_API_KEY", ""))
@@ -3,17 +3,23 @@ extractor.py - Core resume extraction module
 Uses DeepSeek API + LangChain JsonOutputParser
 """
 
-import os
-from typing import List
-from dotenv import load_dotenv
+import json
+import re
+from typing import TYPE_CHECKING, Callable, List, Optional
 
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.messages import SystemMessage
 from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.pydantic_v1 import BaseModel, Field
+from langchain_core.output_parsers.format_instructions import JSON_FORMAT_INSTRUCTIONS
+from langchain_core.pydantic_v1 import BaseModel, Field, validator
+from langchain_core.runnables import RunnableLambda
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
 
-# Load .env file
-load_dotenv()
+import llm_registry
+from config import SETTINGS
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 
 # ──────────────────────────────────────────────────
@@ -37,57 +43,53 @@ class ResumeInfo(BaseModel):
     education: List[str] = Field(
         description="List of educational degrees and certifications with institutions"
     )
+    
+    @validator("skills", "education")
+    def dedupe_entries(cls, values: List[str]) -> List[str]:
+        """Strip entries and drop empty or repeated ones (case-insensitive), keeping order."""
+        unique = {}
+        for value in values:
+            value = value.strip()
+            if value:
+                unique.setdefault(value.lower(), value)
+        return list(unique.values())
 
 
 # ──────────────────────────────────────────────────
 # 2. Initialize DeepSeek LLM
 # ──────────────────────────────────────────────────
-def get_llm() -> ChatOpenAI:
+def get_llm() -> "ChatOpenAI":
     """
     Initialize the DeepSeek LLM using OpenAI-compatible interface.
     DeepSeek exposes an OpenAI-compatible API at api.deepseek.com
+
+    The instance comes from llm_registry, so it is created once and
+    shares its HTTP connection pool with every other LLM in the process.
     """
-    api_key = os.getenv("DEEPSEEK_API_KEY")
-    
-    if not api_key:
-        raise ValueError(
-            "DEEPSEEK_API_KEY not found!\n"
-            "Please add it to your .env file:\n"
-            "DEEPSEEK_API_KEY=your_key_here"
-        )
-    
-    llm = ChatOpenAI(
-        model="deepseek-chat",       # DeepSeek's main model
-        api_key=api_key,
-        base_url="https://api.deepseek.com/v1",  # DeepSeek API endpoint
-        temperature=0                # 0 = deterministic, best for extraction
-    )
-    
-    return llm
+    # temperature 0 = deterministic, best for extraction
+    return llm_registry.get_llm(SETTINGS.model, temperature=0.0)
 
 
 # ──────────────────────────────────────────────────
 # 3. Build the Extraction Chain
 # ──────────────────────────────────────────────────
-def build_extraction_chain():
+def _build_format_instructions() -> str:
     """
-    Builds a LangChain pipeline:
-    ChatPromptTemplate | DeepSeek LLM | JsonOutputParser
+    Same text as JsonOutputParser.get_format_instructions(), but with the
+    schema keys sorted so the rendered string is byte-for-byte stable.
     """
-    llm = get_llm()
-    
-    # Initialize parser with the Pydantic schema
-    # This auto-generates format instructions for the LLM
-    parser = JsonOutputParser(pydantic_object=ResumeInfo)
-    
-    # Get auto-generated format instructions from the parser
-    format_instructions = parser.get_format_instructions()
-    
-    # Build structured prompt
-    prompt = ChatPromptTemplate.from_messages([
-        (
-            "system",
-            """You are an expert resume parser and information extraction specialist.
+    schema = ResumeInfo.schema()
+    schema.pop("title", None)
+    schema.pop("type", None)
+    return JSON_FORMAT_INSTRUCTIONS.format(schema=json.dumps(schema, sort_keys=True))
+
+
+# Generated once at import - identical for every resume
+FORMAT_INSTRUCTIONS = _build_format_instructions()
+
+# The system message never changes between calls, so DeepSeek's prompt cache
+# can reuse it. Everything resume-specific goes into the human message.
+SYSTEM_PROMPT = f"""You are an expert resume parser and information extraction specialist.
 
 Your job is to carefully read a resume and extract specific structured information.
 
@@ -97,11 +99,28 @@ RULES:
 - For skills: include all mentioned technologies, tools, languages, and soft skills
 - For education: include degrees, certifications, and institutions
 - If any field is missing, use: "" for strings, 0 for numbers, [] for lists
+- Fields listed under PRE-EXTRACTED FIELDS were found by exact pattern matching: copy them as-is
 
-{format_instructions}
+{FORMAT_INSTRUCTIONS}
 
 IMPORTANT: Return ONLY valid JSON. No explanations, no markdown, just JSON."""
-        ),
+
+
+def build_extraction_chain():
+    """
+    Builds a LangChain pipeline:
+    ChatPromptTemplate | DeepSeek LLM | JsonOutputParser
+    """
+    llm = get_llm()
+    
+    # Initialize parser with the Pydantic schema
+    parser = JsonOutputParser(pydantic_object=ResumeInfo)
+    
+    # Build structured prompt
+    # The system message is passed as a message object (not a template),
+    # so the JSON schema inside it is sent exactly as rendered above
+    prompt = ChatPromptTemplate.from_messages([
+        SystemMessage(content=SYSTEM_PROMPT),
         (
             "human",
             """Extract structured information from this resume:
@@ -110,13 +129,13 @@ IMPORTANT: Return ONLY valid JSON. No explanations, no markdown, just JSON."""
 {resume_text}
 ================================================
 
+PRE-EXTRACTED FIELDS:
+{prefilled}
+
 Extract and return the JSON now:"""
         )
     ])
     
-    # Inject format instructions as a partial variable
-    prompt = prompt.partial(format_instructions=format_instructions)
-    
     # Create the chain using LangChain's pipe operator
     # Flow: prompt → llm → parser
     chain = prompt | llm | parser
@@ -124,15 +143,142 @@ Extract and return the JSON now:"""
     return chain
 
 
+# The chain is built once and then reused
+_chain = None
+
+
+def _get_chain():
+    """Return the shared extraction chain, building it on first use."""
+    global _chain
+    if _chain is None:
+        _chain = build_extraction_chain()
+    return _chain
+
+
 # ──────────────────────────────────────────────────
 # 4. Main Extraction Function
 # ──────────────────────────────────────────────────
-def extract_resume_info(resume_text: str) -> dict:
+# Max number of resumes sent to DeepSeek at the same time in batch mode
+BATCH_MAX_CONCURRENCY = 16
+
+
+# Fast regex path for fields that do not need an LLM to find
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+# Matches "6 years of experience", "5+ years of hands-on experience", ...
+YEARS_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*\+?\s*years?\s+of\s+(?:[\w-]+\s+){0,3}?experience",
+    re.IGNORECASE,
+)
+
+
+def pre_extract_fields(resume_text: str) -> dict:
+    """
+    Extract email and experience_years with regexes, without the LLM.
+    Only the fields that were actually found are returned.
+    """
+    fields = {}
+    
+    email_match = EMAIL_RE.search(resume_text)
+    if email_match:
+        fields["email"] = email_match.group(0).rstrip(".")
+    
+    years_match = YEARS_RE.search(resume_text)
+    if years_match:
+        fields["experience_years"] = int(float(years_match.group(1)))
+    
+    return fields
+
+
+def _chain_input(resume_text: str, prefilled: dict) -> dict:
+    """Build the chain input, listing the pre-extracted fields for the LLM."""
+    lines = [f"{key}: {value}" for key, value in prefilled.items()]
+    return {
+        "resume_text": resume_text,
+        "prefilled": "\n".join(lines) if lines else "(none)",
+    }
+
+
+def _is_transient_error(error: BaseException) -> bool:
+    """Rate limits, connection problems and 5xx responses are worth retrying."""
+    import openai
+    
+    return isinstance(
+        error,
+        (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError),
+    )
+
+
+# Retry transient API errors with exponential backoff; anything else
+# (e.g. a 400 or a JSON parsing error) fails straight away
+_retry_transient = retry(
+    retry=retry_if_exception(_is_transient_error),
+    wait=wait_random_exponential(multiplier=1, max=20),
+    stop=stop_after_attempt(5),
+    reraise=True,
+)
+
+
+@_retry_transient
+def _invoke_with_retry(chain_input: dict) -> dict:
+    return _get_chain().invoke(chain_input)
+
+
+@_retry_transient
+async def _ainvoke_with_retry(chain_input: dict) -> dict:
+    return await _get_chain().ainvoke(chain_input)
+
+
+@_retry_transient
+def _stream_with_retry(chain_input: dict, on_partial: Callable[[dict], None]) -> dict:
+    # JsonOutputParser yields progressively more complete dicts;
+    # the last one is the full result
+    result = None
+    for partial in _get_chain().stream(chain_input):
+        result = partial
+        on_partial(partial)
+    if result is None:
+        raise ValueError("DeepSeek returned an empty response")
+    return result
+
+
+# Runnable used by the batch functions, so every resume is retried on its own
+_extraction_with_retry = RunnableLambda(_invoke_with_retry, afunc=_ainvoke_with_retry)
+
+
+def _finalize(result: dict, prefilled: dict) -> dict:
+    """
+    Merge the regex fields into the LLM result and validate it against
+    ResumeInfo, which also removes duplicate skills and education entries.
+    """
+    # Regex matches are exact, so they win over the LLM's values
+    return ResumeInfo.parse_obj({**result, **prefilled}).dict()
+
+
+def _fallback_result(error: Exception) -> dict:
+    """Safe default structure returned when an extraction fails."""
+    return {
+        "name": "",
+        "email": "",
+        "skills": [],
+        "experience_years": 0,
+        "education": [],
+        "extraction_error": str(error)
+    }
+
+
+def extract_resume_info(
+    resume_text: str,
+    on_partial: Optional[Callable[[dict], None]] = None,
+) -> dict:
     """
     Extract structured information from raw resume text.
     
     Args:
         resume_text (str): Unstructured resume text
+        on_partial (callable, optional): If given, the response is streamed
+              and this is called with each partial dict (e.g. a growing
+              skills list) while the model is still generating.
+              Streaming bypasses the LLM response cache.
         
     Returns:
         dict: Structured resume data with fields:
@@ -141,24 +287,88 @@ def extract_resume_info(resume_text: str) -> dict:
     if not resume_text or not resume_text.strip():
         raise ValueError("Resume text cannot be empty!")
     
-    chain = build_extraction_chain()
+    # Build the chain up front, so a missing API key raises instead of
+    # being turned into a fallback result
+    _get_chain()
+    prefilled = pre_extract_fields(resume_text)
+    chain_input = _chain_input(resume_text, prefilled)
     
     try:
         print("Sending to DeepSeek API for extraction...")
-        result = chain.invoke({"resume_text": resume_text})
+        if on_partial is None:
+            result = _invoke_with_retry(chain_input)
+        else:
+            result = _stream_with_retry(chain_input, on_partial)
         print("Extraction successful!")
-        return result
+        return _finalize(result, prefilled)
         
     except Exception as e:
         print(f"Error during extraction: {type(e).__name__}: {e}")
         print("Returning default structure with error info...")
         
         # Return safe fallback structure on any error
-        return {
-            "name": "",
-            "email": "",
-            "skills": [],
-            "experience_years": 0,
-            "education": [],
-            "extraction_error": str(e)
-        }
\ No newline at end of file
+        return _fallback_result(e)
+
+
+# ──────────────────────────────────────────────────
+# 5. Batch Extraction
+# ──────────────────────────────────────────────────
+def _batch_prefill(resume_texts: List[str]) -> List[dict]:
+    """Validate the resumes and pre-extract regex fields for each one."""
+    if any(not text or not text.strip() for text in resume_texts):
+        raise ValueError("Resume text cannot be empty!")
+    return [pre_extract_fields(text) for text in resume_texts]
+
+
+def _batch_results(results: list, prefills: List[dict]) -> List[dict]:
+    """Finalize each result of a batch; failed items get the fallback."""
+    final = []
+    for result, prefilled in zip(results, prefills):
+        if isinstance(result, Exception):
+            final.append(_fallback_result(result))
+            continue
+        try:
+            final.append(_finalize(result, prefilled))
+        except Exception as e:
+            final.append(_fallback_result(e))
+    return final
+
+
+def extract_resumes_batch(resume_texts: List[str]) -> List[dict]:
+    """
+    Extract structured information from many resumes concurrently.
+    
+    Args:
+        resume_texts (List[str]): Unstructured resume texts
+        
+    Returns:
+        List[dict]: One result per resume, in the same order. A resume
+                    that fails gets the fallback structure with
+                    "extraction_error" instead of failing the whole batch.
+    """
+    prefills = _batch_prefill(resume_texts)
+    inputs = [_chain_input(text, prefilled) for text, prefilled in zip(resume_texts, prefills)]
+    
+    print(f"Sending {len(inputs)} resumes to DeepSeek API for extraction...")
+    _get_chain()  # build once before the batch fans out to worker threads
+    results = _extraction_with_retry.batch(
+        inputs,
+        config={"max_concurrency": BATCH_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    return _batch_results(results, prefills)
+
+
+async def extract_resumes_batch_async(resume_texts: List[str]) -> List[dict]:
+    """Async version of extract_resumes_batch()."""
+    prefills = _batch_prefill(resume_texts)
+    inputs = [_chain_input(text, prefilled) for text, prefilled in zip(resume_texts, prefills)]
+    
+    print(f"Sending {len(inputs)} resumes to DeepSeek API for extraction...")
+    _get_chain()  # build once before the batch fans out
+    results = await _extraction_with_retry.abatch(
+        inputs,
+        config={"max_concurrency": BATCH_MAX_CONCURRENCY},
+        return_exceptions=True,
+    )
+    return _batch_results(results, prefills)
@@ -0,0 +1,102 @@
+"""
+llm_registry.py - Shared DeepSeek LLM instances
+Keeps one ChatOpenAI per (model, temperature, base_url), all of them
+sending requests over the same pooled HTTP connections
+"""
+
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from config import SETTINGS
+
+# httpx, langchain_openai and langchain_community are slow to import, so
+# they are only loaded when the first LLM is created
+if TYPE_CHECKING:
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+
+_CACHE: Dict[Tuple[str, float, str], "ChatOpenAI"] = {}
+_http_clients: Optional[Tuple["httpx.Client", "httpx.AsyncClient"]] = None
+
+
+def get_http_clients() -> Tuple["httpx.Client", "httpx.AsyncClient"]:
+    """
+    Return the shared (sync, async) HTTP clients, creating them on first use.
+    Every request reuses these pools, so only the first call pays for the
+    TCP + TLS handshake with api.deepseek.com
+    """
+    global _http_clients
+    if _http_clients is None:
+        import httpx
+        
+        limits = httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=50,
+            keepalive_expiry=60.0,
+        )
+        timeout = httpx.Timeout(60.0)
+        _http_clients = (
+            httpx.Client(limits=limits, timeout=timeout),
+            httpx.AsyncClient(limits=limits, timeout=timeout),
+        )
+    return _http_clients
+
+
+def get_llm(model: str = SETTINGS.model, temperature: float = 0.0) -> "ChatOpenAI":
+    """
+    Return the shared DeepSeek LLM for this model and temperature.
+    DeepSeek exposes an OpenAI-compatible API, so ChatOpenAI is used.
+    """
+    key = (model, temperature, SETTINGS.base_url)
+    if key in _CACHE:
+        return _CACHE[key]
+    
+    if not SETTINGS.api_key:
+        raise ValueError(
+            "DEEPSEEK_API_KEY not found!\n"
+            "Please add it to your .env file:\n"
+            "DEEPSEEK_API_KEY=your_key_here"
+        )
+    
+    from langchain_community.cache import SQLiteCache
+    from langchain_core.globals import set_llm_cache
+    from langchain_openai import ChatOpenAI
+    
+    if not _CACHE:
+        # Cache LLM responses on disk: a prompt that was already answered
+        # (same model, temperature and text) is served without calling the API
+        set_llm_cache(SQLiteCache(database_path=SETTINGS.llm_cache_path))
+    
+    http_client, http_async_client = get_http_clients()
+    _CACHE[key] = ChatOpenAI(
+        model=model,
+        api_key=SETTINGS.api_key,
+        base_url=SETTINGS.base_url,
+        temperature=temperature,
+        max_retries=0,               # callers retry transient errors with tenacity
+        http_client=http_client,
+        http_async_client=http_async_client,
+    )
+    return _CACHE[key]
+
+
+def _warm_up_connection(http_client: "httpx.Client") -> None:
+    """Open a TLS connection to DeepSeek; the response itself is ignored."""
+    try:
+        http_client.head(f"{SETTINGS.base_url}/models")
+    except Exception:
+        # Warm-up is best effort - the real request will connect anyway
+        pass
+
+
+def preconnect() -> None:
+    """
+    Start connecting to api.deepseek.com in the background, so the first
+    request does not wait for the TCP + TLS handshake.
+    Does nothing if the API key is not configured.
+    """
+    if not SETTINGS.api_key:
+        return
+    http_client, _ = get_http_clients()
+    threading.Thread(target=_warm_up_connection, args=(http_client,), daemon=True).start()
@@ -3,8 +3,9 @@ main.py - Resume Extractor Entry Point
 Assignment 2: JsonOutputParser with DeepSeek API
 """
 
-import json
+import orjson
 from extractor import extract_resume_info
+from llm_registry import preconnect
 
 
 # ──────────────────────────────────────────────────
@@ -62,7 +63,7 @@ def display_results(result: dict) -> None:
     
     # Full JSON output
     print("\n--- FULL JSON OUTPUT ---")
-    print(json.dumps(result, indent=2))
+    print(orjson.dumps(result, option=orjson.OPT_INDENT_2).decode())
     
     # Summary view
     print("\n--- SUMMARY ---")
@@ -90,6 +91,9 @@ def display_results(result: dict) -> None:
 def main():
     """Main function to run the resume extractor."""
     
+    # Start the HTTPS handshake while the rest of the setup runs
+    preconnect()
+    
     print("=" * 60)
     print("  RESUME INFORMATION EXTRACTOR")
     print("  DeepSeek API + LangChain JsonOutputParser")
@@ -1,8 +1,9 @@
 """
 Assignment 3: Product Review Analyzer
-Using PydanticOutputParser + DeepSeek API
+Using Pydantic structured output (function calling) + DeepSeek API
 """
 
+import asyncio
 import os
 from typing import List
 
@@ -11,10 +12,11 @@ from dotenv import load_dotenv
 # Pydantic
 from pydantic import BaseModel, Field, ValidationError
 
-# LangChain
-from langchain_openai import ChatOpenAI
-from langchain.output_parsers import PydanticOutputParser
-from langchain.prompts import PromptTemplate
+# Retries
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+# LangChain, httpx and the OpenAI SDK are imported inside get_chain(), so
+# the script starts quickly and only pays for them when they are needed
 
 # ─────────────────────────────────────────────
 # 1. LOAD ENVIRONMENT VARIABLES
@@ -51,97 +53,175 @@ class ReviewAnalysis(BaseModel):
     )
 
 
-# ─────────────────────────────────────────────
-# 3. INITIALIZE DeepSeek via OpenAI-Compatible API
-# ─────────────────────────────────────────────
-llm = ChatOpenAI(
-    model="deepseek-chat",
-    openai_api_key=DEEPSEEK_API_KEY,
-    openai_api_base="https://api.deepseek.com/v1",
-    temperature=0.0,  # deterministic output for structured parsing
-)
-
+class ReviewBatch(BaseModel):
+    """Analyses for several reviews returned by a single LLM call."""
 
-# ─────────────────────────────────────────────
-# 4. SET UP PydanticOutputParser
-# ─────────────────────────────────────────────
-parser = PydanticOutputParser(pydantic_object=ReviewAnalysis)
+    analyses: List[ReviewAnalysis] = Field(
+        description="One analysis per review, in the same order as the reviews were given."
+    )
 
 
 # ─────────────────────────────────────────────
-# 5. BUILD THE PROMPT TEMPLATE
+# 3. PROMPT TEXT
 # ─────────────────────────────────────────────
-prompt_template = PromptTemplate(
-    input_variables=["review"],
-    partial_variables={"format_instructions": parser.get_format_instructions()},
-    template="""
-You are an expert product review analyst. Analyze the following product review and extract structured insights.
+PROMPT_TEXT = """
+You are an expert product review analyst. Analyze each of the following product reviews and extract structured insights.
 
-Product Review:
-\"\"\"{review}\"\"\"
+Product Reviews:
+{reviews}
 
-Instructions:
+Instructions (apply to every review separately):
 - Determine the overall sentiment (Positive, Negative, or Neutral).
 - Estimate a rating from 1 (very poor) to 5 (excellent) based on the review.
 - List all key features of the product that are mentioned or appreciated.
 - List all improvement suggestions or complaints that could help improve the product.
 
-{format_instructions}
-
 Important:
-- Return ONLY the JSON object. Do NOT include markdown code blocks or extra text.
+- Return exactly one entry in "analyses" per review, in the same order (REVIEW 1 first).
 - Ensure rating is an integer between 1 and 5.
 - Ensure sentiment is exactly one of: Positive, Negative, Neutral.
-""",
+"""
+
+
+def format_reviews(reviews: List[str]) -> str:
+    """Render reviews as numbered blocks for the batch prompt."""
+    return "\n\n".join(
+        f'REVIEW {idx}:\n"""{review}"""' for idx, review in enumerate(reviews, 1)
+    )
+
+
+# The static part of the prompt is rendered once; per call only the
+# placeholder is swapped for the reviews
+_REVIEWS_PLACEHOLDER = "__REVIEWS_PLACEHOLDER__"
+_STATIC_PROMPT = PROMPT_TEXT.format(reviews=_REVIEWS_PLACEHOLDER)
+
+
+def build_prompt(reviews: List[str]) -> str:
+    """Return the full prompt for a batch of reviews."""
+    return _STATIC_PROMPT.replace(_REVIEWS_PLACEHOLDER, format_reviews(reviews))
+
+
+# ─────────────────────────────────────────────
+# 4. INITIALIZE DeepSeek + STRUCTURED OUTPUT
+# ─────────────────────────────────────────────
+# Built on first use by get_chain()
+_chain = None
+
+
+def get_chain():
+    """Build the structured-output LLM once and reuse it."""
+    global _chain
+    if _chain is not None:
+        return _chain
+
+    import httpx
+    from langchain_openai import ChatOpenAI
+    from langchain.globals import set_llm_cache
+    from langchain_community.cache import SQLiteCache
+
+    # Cache LLM responses on disk: re-running identical reviews skips the API
+    set_llm_cache(SQLiteCache(database_path=".llm_cache.db"))
+
+    # Shared async connection pool: concurrent reviews reuse warm TLS connections
+    http_async_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60.0),
+        timeout=httpx.Timeout(60.0),
+    )
+
+    llm = ChatOpenAI(
+        model="deepseek-chat",
+        openai_api_key=DEEPSEEK_API_KEY,
+        openai_api_base="https://api.deepseek.com/v1",
+        temperature=0.0,  # deterministic output for structured parsing
+        max_retries=0,    # retries are handled by _ainvoke_with_retry()
+        http_async_client=http_async_client,
+    )
+
+    # The schema is sent as a function definition, so DeepSeek returns the
+    # fields directly and LangChain validates them into a ReviewBatch.
+    # The prompt is already a plain string (see build_prompt), so no
+    # PromptTemplate is needed in front of it.
+    _chain = llm.with_structured_output(ReviewBatch)
+    return _chain
+
+
+def _is_transient_error(error: BaseException) -> bool:
+    """Rate limits, connection problems and 5xx responses are worth retrying."""
+    import openai
+
+    return isinstance(
+        error,
+        (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError),
+    )
+
+
+@retry(
+    retry=retry_if_exception(_is_transient_error),
+    wait=wait_random_exponential(multiplier=1, max=20),
+    stop=stop_after_attempt(5),
+    reraise=True,
 )
+async def _ainvoke_with_retry(prompt: str) -> ReviewBatch:
+    """Run the chain, retrying transient API errors with exponential backoff."""
+    return await get_chain().ainvoke(prompt)
+
+
+# ─────────────────────────────────────────────
+# 5. BATCHING SETTINGS
+# ─────────────────────────────────────────────
+# Number of reviews packed into one prompt (shares the instructions above)
+BATCH_SIZE = 8
+
+# Max number of batches in flight at once (keeps us clear of rate limits)
+MAX_CONCURRENCY = 8
 
 
 # ─────────────────────────────────────────────
 # 6. CORE ANALYSIS FUNCTION WITH ERROR HANDLING
 # ─────────────────────────────────────────────
-def analyze_review(review_text: str) -> ReviewAnalysis | None:
+async def analyze_reviews_async(
+    review_texts: List[str], semaphore: asyncio.Semaphore
+) -> List[ReviewAnalysis | None]:
     """
-    Analyzes a product review and returns a validated ReviewAnalysis object.
+    Analyzes a batch of product reviews with a single LLM call.
+
+    Several batches can be analyzed concurrently; the semaphore caps how
+    many requests are sent to DeepSeek at the same time.
 
     Args:
-        review_text: The raw product review string.
+        review_texts: The raw product review strings (at most BATCH_SIZE).
+        semaphore: Shared semaphore limiting concurrent API calls.
 
     Returns:
-        ReviewAnalysis object or None if parsing fails.
+        One ReviewAnalysis per review, or None for every review of the
+        batch if parsing fails.
     """
-    print("\n" + "=" * 60)
-    print("📦 PRODUCT REVIEW ANALYZER")
-    print("=" * 60)
-    print(f"\n📝 Review:\n{review_text}\n")
+    failed = [None] * len(review_texts)
 
     try:
-        # Step 1: Format the prompt
-        formatted_prompt = prompt_template.format(review=review_text)
+        async with semaphore:
+            # Build the prompt, call DeepSeek and validate with Pydantic
+            result = await _ainvoke_with_retry(build_prompt(review_texts))
 
-        # Step 2: Send to DeepSeek LLM
-        print("🔄 Sending to DeepSeek API...")
-        raw_response = llm.invoke(formatted_prompt)
-        raw_content = raw_response.content
-        print(f"\n🤖 Raw LLM Output:\n{raw_content}\n")
-
-        # Step 3: Parse and validate with Pydantic
-        print("✅ Parsing and validating output...")
-        result = parser.parse(raw_content)
-        return result
+        if len(result.analyses) != len(review_texts):
+            raise ValueError(
+                f"Expected {len(review_texts)} analyses, got {len(result.analyses)}."
+            )
+        return result.analyses
 
     except ValidationError as ve:
         print(f"\n❌ Pydantic Validation Error:\n{ve}")
         print("💡 The LLM returned data that doesn't match the expected schema.")
-        return None
+        return failed
 
     except ValueError as ve:
         print(f"\n❌ Parsing Error:\n{ve}")
         print("💡 The LLM output could not be parsed into the expected format.")
-        return None
+        return failed
 
     except Exception as e:
         print(f"\n❌ Unexpected Error:\n{type(e).__name__}: {e}")
-        return None
+        return failed
 
 
 # ─────────────────────────────────────────────
@@ -185,7 +265,8 @@ def display_results(analysis: ReviewAnalysis | None) -> None:
 # ─────────────────────────────────────────────
 # 8. SAMPLE REVIEWS TO TEST
 # ─────────────────────────────────────────────
-SAMPLE_REVIEWS = [
+# Stripped once here, so the reviews are ready to send as-is
+SAMPLE_REVIEWS = tuple(review.strip() for review in (
     # Review 1: Positive with minor complaints
     """
     I absolutely love this wireless headphone! The sound quality is crystal clear and the bass
@@ -212,25 +293,40 @@ SAMPLE_REVIEWS = [
     which is annoying in the morning. The carafe leaks a bit when pouring.
     It's an okay product for the price range. Nothing extraordinary but gets the job done.
     """,
-]
+))
 
 
 # ─────────────────────────────────────────────
 # 9. MAIN ENTRY POINT
 # ─────────────────────────────────────────────
-def main():
+async def main():
     print("\n🚀 Starting Product Review Analyzer...\n")
 
-    for idx, review in enumerate(SAMPLE_REVIEWS, 1):
+    reviews = SAMPLE_REVIEWS
+
+    # Pack reviews into batches and send all batches to DeepSeek concurrently
+    batches = [reviews[i:i + BATCH_SIZE] for i in range(0, len(reviews), BATCH_SIZE)]
+    print(f"🔄 Sending {len(reviews)} reviews to DeepSeek API in {len(batches)} request(s)...")
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    batch_results = await asyncio.gather(
+        *(analyze_reviews_async(batch, semaphore) for batch in batches)
+    )
+    results = [result for batch in batch_results for result in batch]
+
+    for idx, (review, result) in enumerate(zip(reviews, results), 1):
         print(f"\n{'#' * 60}")
-        print(f"  ANALYZING REVIEW {idx} of {len(SAMPLE_REVIEWS)}")
+        print(f"  ANALYZING REVIEW {idx} of {len(reviews)}")
         print(f"{'#' * 60}")
 
-        result = analyze_review(review.strip())
+        print("\n" + "=" * 60)
+        print("📦 PRODUCT REVIEW ANALYZER")
+        print("=" * 60)
+        print(f"\n📝 Review:\n{review}\n")
+
         display_results(result)
 
     print("\n✅ All reviews analyzed successfully!\n")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file